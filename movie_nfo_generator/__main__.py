@@ -1,21 +1,25 @@
 #!/usr/bin/env python3
 """.NFO file generator for movies and series"""
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from os import walk
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import cpu_count, walk
 from os.path import relpath, basename, splitext, join, exists
-from threading import Lock
 
 from requests import HTTPError
+from requests.adapters import HTTPAdapter
 
 from os.path import dirname, realpath
 import sys
 
 sys.path.insert(0, dirname(dirname(realpath(__file__))))
 
-from movie_nfo_generator.config import INI
+from movie_nfo_generator.concurrency import AdaptiveExecutor, RetrySession
+from movie_nfo_generator.config import CONFIG_DIR, INI
+import movie_nfo_generator.fingerprint as index
 import movie_nfo_generator.scraper_tmdb as tmdb
-from movie_nfo_generator.nfo import write_nfo
+from movie_nfo_generator.nfo import audit_nfo, read_nfo, write_nfo
 from movie_nfo_generator.utilities import (
+    UI_LOCK,
     choose_title,
     filter_filename,
     filepath_to_titles,
@@ -23,83 +27,316 @@ from movie_nfo_generator.utilities import (
 )
 
 
-_UI_LOCK = Lock()
-_workers = ThreadPoolExecutor(max_workers=2)
+_workers = AdaptiveExecutor(
+    INI.getint("General", "min_workers"),
+    INI.getint("General", "max_workers"),
+    INI.getfloat("General", "target_latency"),
+)
+_session = RetrySession(_workers)
+_session.hooks["response"].append(_workers.record_response)
+_session.mount(
+    "https://", HTTPAdapter(pool_maxsize=INI.getint("General", "max_workers"))
+)
+tmdb.use_session(_session)
 
 #: Media formats
 FORMATS = [_format.lower().strip() for _format in INI.get("General", "formats").split()]
 
+#: NFO paths of additional languages ("nfo_path_LANGUAGE" options), by library section
+LANGUAGES_PATHS = {
+    section: {
+        option[len("nfo_path_") :]: INI.get(section, option)
+        for option in INI.options(section)
+        if option.startswith("nfo_path_")
+    }
+    for section in ("Movies", "Tv Shows")
+}
+
+#: Default repair list file
+REPAIR_LIST = join(CONFIG_DIR, "repair.txt")
+
+#: NFO files to regenerate even if they exist
+_REPAIR = set()
 
-def nfo_movie(media_filepath, movie_set="", sorttitle=""):
+
+def _nfo_missing(nfo_file):
     """
-    Create a NFO file for a movie.
+    Return True if the NFO file need to be generated.
 
     Args:
-        media_filepath (str): Movie file path.
-        movie_set (str): Movie set name.
-        sorttitle (str): Sort title.
+        nfo_file (str): NFO file path.
+
+    Returns:
+        bool: True if missing or to repair.
     """
-    short_title, long_title, year = filepath_to_titles(
-        media_filepath, True if movie_set else False
+    return nfo_file in _REPAIR or not exists(nfo_file)
+
+
+def _nfo_targets(section, media_path, filename=None):
+    """
+    Return NFO files to generate for a media, by language.
+
+    The main language NFO is written next to the media, additional languages NFO are
+    written in their configured path using the same relative path than the media.
+
+    Args:
+        section (str): Media library configuration section.
+        media_path (str): Media file path without extension, or media directory.
+        filename (str): NFO file name, if stored in media directory.
+
+    Returns:
+        dict: NFO media path (As "write_nfo" media_filename) by language.
+    """
+    media_paths = {tmdb.LANGUAGE: media_path}
+    library_path = INI.get(section, "path")
+    for language, path in LANGUAGES_PATHS[section].items():
+        media_paths[language] = join(path, relpath(media_path, library_path))
+
+    return {
+        language: path
+        for language, path in media_paths.items()
+        if _nfo_missing(join(path, filename) if filename else f"{path}.nfo")
+    }
+
+
+def _nfo_repair(targets, filename=None):
+    """
+    Return True if NFO files are generated to repair existing ones.
+
+    Repaired NFO files are regenerated from the scrapper, not from the index.
+
+    Args:
+        targets (dict): NFO media path by language.
+        filename (str): NFO file name, if stored in media directory.
+
+    Returns:
+        bool: True if any NFO file is to repair.
+    """
+    return any(
+        (join(path, filename) if filename else f"{path}.nfo") in _REPAIR
+        for path in targets.values()
     )
 
-    nfo_fields, nfo_link = tmdb.get_movie_infos(short_title, year)
 
-    with _UI_LOCK:
-        print(f'Creating NFO file for "{media_filepath}"')
-        nfo_fields["title"] = choose_title(long_title, nfo_fields["title"])
-    nfo_fields["set"] = movie_set
-    nfo_fields["sorttitle"] = sorttitle
+def _link_id(link):
+    """
+    Return the scrapper ID from a scrapper URL link.
 
-    write_nfo("movie", nfo_fields, media_filepath, link=nfo_link)
+    Args:
+        link (str): Scrapper URL link.
+
+    Returns:
+        str: Scrapper ID, or None if not a valid link.
+    """
+    try:
+        return link.rsplit("/", 1)[1].strip() or None
+    except IndexError:
+        return None
 
 
-def nfo_tv_show(media_filedir):
+def _read_scraper_id(nfo_file, root_name):
     """
-    Create a NFO file for a serie.
+    Return the scrapper ID from an existing NFO file link.
 
     Args:
-        media_filedir (str): Serie directory path.
+        nfo_file (str): NFO file path.
+        root_name (str): NFO root name.
+
+    Returns:
+        str: Scrapper ID, or None if the NFO file is missing, truncated or has no
+            link.
     """
-    title, _, year = filepath_to_titles(media_filedir)
+    try:
+        with open(nfo_file, "rt") as file:
+            _, root_end, url = file.read().rpartition(f"</{root_name}>")
+    except OSError:
+        return None
+    return _link_id(url) if root_end else None
 
-    nfo_fields, nfo_link, scraper_id, original_language = tmdb.get_tv_show_infos(
-        title, year
-    )
 
-    with _UI_LOCK:
-        print(f'Creating NFO file for "{media_filedir}"')
-        nfo_fields["title"] = choose_title(title, nfo_fields["title"])
+def _previous_infos(nfo_file, root_name, cached=None):
+    """
+    Return the scrapper ID and title of an NFO file to repair.
+
+    They are read from the damaged NFO file if available, else from the index, to
+    not search and ask the user again.
+
+    Args:
+        nfo_file (str): Main language NFO file path.
+        root_name (str): NFO root name.
+        cached (dict): Index entry, if any.
+
+    Returns:
+        tuple: Scrapper ID and title, None if not available.
+    """
+    scraper_id = _read_scraper_id(nfo_file, root_name)
+    try:
+        title = read_nfo(nfo_file, root_name)[0].get("title")
+    except (OSError, ValueError):
+        title = None
+    if cached:
+        scraper_id = scraper_id or _link_id(cached["link"])
+        title = title or cached["fields"].get(tmdb.LANGUAGE, {}).get("title")
+    return scraper_id, title if isinstance(title, str) else None
+
+
+def nfo_movie(
+    media_filepath, media_file, targets, movie_set="", sorttitle="", scraper_id=None
+):
+    """
+    Create NFO files for a movie.
+
+    Args:
+        media_filepath (str): Movie file path.
+        media_file (str): Movie file path, with extension.
+        targets (dict): NFO media path by language.
+        movie_set (str): Movie set name.
+        sorttitle (str): Sort title.
+        scraper_id (str): Scrapper ID, if already known.
+    """
+    repair = _nfo_repair(targets)
+    cached = index.get_media(media_file, None if repair else targets)
+    if cached and not repair:
+        nfo_fields = cached["fields"]
+        nfo_link = cached["link"]
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filepath}" from index')
+
+    else:
+        title = None
+        if repair:
+            previous_id, title = _previous_infos(
+                f"{media_filepath}.nfo", "movie", cached
+            )
+            scraper_id = scraper_id or previous_id
+
+        short_title, long_title, year = filepath_to_titles(
+            media_filepath, True if movie_set else False
+        )
+
+        nfo_fields, nfo_link = tmdb.get_movie_infos(
+            short_title, year, languages=targets, tmdb_id=scraper_id
+        )
+
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filepath}"')
+            if tmdb.LANGUAGE in targets:
+                fields = nfo_fields[tmdb.LANGUAGE]
+                fields["title"] = title or choose_title(long_title, fields["title"])
+        index.set_media(media_file, nfo_fields, nfo_link, targets, refresh=repair)
+
+    for language, target in targets.items():
+        fields = nfo_fields[language]
+        fields["set"] = movie_set
+        fields["sorttitle"] = sorttitle
+        write_nfo("movie", fields, target, link=nfo_link)
+
+
+def nfo_tv_show(media_filedir, targets, scraper_id=None):
+    """
+    Create NFO files for a serie.
 
-    write_nfo("tvshow", nfo_fields, media_filedir, link=nfo_link, filename="tvshow.nfo")
+    Args:
+        media_filedir (str): Serie directory path.
+        targets (dict): NFO media path by language.
+        scraper_id (str): Scrapper ID, if already known.
+    """
+    repair = _nfo_repair(targets, "tvshow.nfo")
+    cached = None
+    if scraper_id:
+        cached = index.get_tv_show(scraper_id, None if repair else targets)
+    if cached and not repair:
+        nfo_fields = cached["fields"]
+        nfo_link = cached["link"]
+        original_language = cached["original_language"]
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filedir}" from index')
+
+    else:
+        previous_title = None
+        if repair:
+            previous_id, previous_title = _previous_infos(
+                join(media_filedir, "tvshow.nfo"), "tvshow", cached
+            )
+            scraper_id = scraper_id or previous_id
+
+        title, _, year = filepath_to_titles(media_filedir)
+
+        nfo_fields, nfo_link, scraper_id, original_language = tmdb.get_tv_show_infos(
+            title, year, tmdb_id=scraper_id, languages=targets
+        )
+
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filedir}"')
+            if tmdb.LANGUAGE in targets:
+                fields = nfo_fields[tmdb.LANGUAGE]
+                fields["title"] = previous_title or choose_title(title, fields["title"])
+        index.set_tv_show(
+            scraper_id, nfo_fields, nfo_link, targets, original_language, repair
+        )
+
+    for language, target in targets.items():
+        write_nfo(
+            "tvshow", nfo_fields[language], target, link=nfo_link, filename="tvshow.nfo"
+        )
 
     return scraper_id, original_language
 
 
-def nfo_tv_episode(scraper_id, media_filepath, original_language, number):
+def nfo_tv_episode(
+    scraper_id, media_filepath, media_file, original_language, number, targets
+):
     """
-    Create a NFO file for a serie.
+    Create NFO files for a serie.
 
     Args:
         scraper_id:
         media_filepath (str): Episode file path.
+        media_file (str): Episode file path, with extension.
         original_language (str): Language
         number (int): Episode number.
+        targets (dict): NFO media path by language.
     """
-
     name, season_num, episode_num = filepath_to_episode_id(media_filepath, True)
 
-    nfo_fields, nfo_link = tmdb.get_tv_episode_infos(
-        scraper_id, season_num, episode_num, original_language
+    repair = _nfo_repair(targets)
+    cached = index.get_episode(
+        media_file, None if repair else targets, scraper_id, season_num, episode_num
     )
-
-    with _UI_LOCK:
-        print(f'Creating NFO file for "{media_filepath}"')
-        nfo_fields["title"] = choose_title(name, nfo_fields["title"])
-    nfo_fields["displayepisode"] = str(number)
-    nfo_fields["displayseason"] = "1"
-
-    write_nfo("episodedetails", nfo_fields, media_filepath, link=nfo_link)
+    if cached and not repair:
+        nfo_fields = cached["fields"]
+        nfo_link = cached["link"]
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filepath}" from index')
+
+    else:
+        title = None
+        if repair:
+            _, title = _previous_infos(
+                f"{media_filepath}.nfo", "episodedetails", cached
+            )
+
+        if original_language is None:
+            original_language = tmdb.get_tv_show_infos(tmdb_id=scraper_id)[-1]
+
+        nfo_fields, nfo_link = tmdb.get_tv_episode_infos(
+            scraper_id, season_num, episode_num, original_language, languages=targets
+        )
+
+        with UI_LOCK:
+            print(f'Creating NFO file for "{media_filepath}"')
+            if tmdb.LANGUAGE in targets:
+                fields = nfo_fields[tmdb.LANGUAGE]
+                fields["title"] = title or choose_title(name, fields["title"])
+        index.set_media(
+            media_file, nfo_fields, nfo_link, targets, scraper_id, refresh=repair
+        )
+
+    for language, target in targets.items():
+        fields = nfo_fields[language]
+        fields["displayepisode"] = str(number)
+        fields["displayseason"] = "1"
+        write_nfo("episodedetails", fields, target, link=nfo_link)
 
 
 def walk_movies():
@@ -121,13 +358,21 @@ def walk_movies():
 
             # path
             media_filepath = join(root, media_filename)
-            if not exists(f"{media_filepath}.nfo"):
+            targets = _nfo_targets("Movies", media_filepath)
+            if targets:
+                scraper_id = None
+                if tmdb.LANGUAGE not in targets:
+                    scraper_id = _read_scraper_id(f"{media_filepath}.nfo", "movie")
+
                 futures.append(
                     _workers.submit(
                         nfo_movie,
                         media_filepath,
+                        join(root, file),
+                        targets,
                         movie_set=movie_set,
                         sorttitle=sorttitle,
+                        scraper_id=scraper_id,
                     )
                 )
 
@@ -146,31 +391,40 @@ def walk_tv_shows():
         if not tv_show:
             continue
 
-        nfo_file = join(root, "tvshow.nfo")
-        if not exists(nfo_file):
-            scraper_id, original_language = nfo_tv_show(root)
-        else:
-            with open(nfo_file, "rt") as file:
-                url = file.read().rsplit("</tvshow>", 1)[1]
-            try:
-                scraper_id = url.rsplit("/", 1)[1]
-            except IndexError:
+        media_files = [
+            join(root, file)
+            for file in sorted(files, key=str.lower)
+            if splitext(file)[1].lower() in FORMATS
+        ]
+
+        scraper_id = None
+        original_language = None
+        targets = _nfo_targets("Tv Shows", root, "tvshow.nfo")
+        if tmdb.LANGUAGE not in targets:
+            scraper_id = _read_scraper_id(join(root, "tvshow.nfo"), "tvshow")
+            if scraper_id is None:
                 continue
+        else:
+            if _nfo_repair(targets, "tvshow.nfo"):
+                scraper_id = _read_scraper_id(join(root, "tvshow.nfo"), "tvshow")
+            scraper_id = scraper_id or index.find_tv_show(media_files)
 
-            original_language = None
+        if targets:
+            scraper_id, original_language = nfo_tv_show(root, targets, scraper_id)
+        else:
+            cached = index.get_tv_show(scraper_id, ())
+            if cached:
+                original_language = cached["original_language"]
 
-        number = 0
         futures = []
-        for file in sorted(files, key=str.lower):
-            media_filename, ext = splitext(file)
-            if ext.lower() not in FORMATS:
-                continue
-
-            number += 1
-            media_filepath = join(root, media_filename)
-            if not exists(f"{media_filepath}.nfo"):
-
-                if original_language is None:
+        for number, media_file in enumerate(media_files, 1):
+            media_filepath = splitext(media_file)[0]
+            targets = _nfo_targets("Tv Shows", media_filepath)
+            if targets:
+
+                if original_language is None and (
+                    _nfo_repair(targets) or not index.get_media(media_file, targets)
+                ):
                     original_language = tmdb.get_tv_show_infos(tmdb_id=scraper_id)[-1]
 
                 futures.append(
@@ -178,8 +432,10 @@ def walk_tv_shows():
                         nfo_tv_episode,
                         scraper_id,
                         media_filepath,
+                        media_file,
                         original_language,
                         number,
+                        targets,
                     )
                 )
 
@@ -195,10 +451,224 @@ def walk_tv_shows():
     print("All TV shows have NFO...")
 
 
+def _iter_nfo_files():
+    """
+    Yield existing NFO files.
+
+    Existence is checked against directories listings to avoid a "stat" call per
+    file.
+
+    Yields:
+        tuple of str: NFO file path, NFO root name, media file path or TV show
+            directory (None if not found), language.
+    """
+    media_files = {}
+    for root, _, files in walk(INI.get("Movies", "path")):
+        files = set(files)
+        for file in files:
+            media_filename, ext = splitext(file)
+            if ext.lower() in FORMATS and f"{media_filename}.nfo" in files:
+                media_file = join(root, file)
+                media_files[join(root, media_filename)] = media_file
+                nfo_file = join(root, f"{media_filename}.nfo")
+                yield nfo_file, "movie", media_file, tmdb.LANGUAGE
+
+    tv_shows_path = INI.get("Tv Shows", "path")
+    for root, _, files in walk(tv_shows_path):
+        if not filter_filename(basename(relpath(root, tv_shows_path))):
+            continue
+        files = set(files)
+        if "tvshow.nfo" in files:
+            yield join(root, "tvshow.nfo"), "tvshow", root, tmdb.LANGUAGE
+        for file in files:
+            media_filename, ext = splitext(file)
+            if ext.lower() in FORMATS and f"{media_filename}.nfo" in files:
+                media_file = join(root, file)
+                media_files[join(root, media_filename)] = media_file
+                nfo_file = join(root, f"{media_filename}.nfo")
+                yield nfo_file, "episodedetails", media_file, tmdb.LANGUAGE
+
+    for section, root_name in (("Movies", "movie"), ("Tv Shows", "episodedetails")):
+        library_path = INI.get(section, "path")
+        for language, path in LANGUAGES_PATHS[section].items():
+            for root, _, files in walk(path):
+                media_root = join(library_path, relpath(root, path))
+                for file in files:
+                    if file == "tvshow.nfo":
+                        yield join(root, file), "tvshow", media_root, language
+                    elif file.lower().endswith(".nfo"):
+                        media_file = media_files.get(join(media_root, file[:-4]))
+                        yield join(root, file), root_name, media_file, language
+
+
+def _index_nfo_files(pool, chunksize, nfo_files):
+    """
+    Fill the index from valid existing NFO files.
+
+    Media files already indexed are skipped to not read them again.
+
+    Args:
+        pool (concurrent.futures.Executor): Worker processes pool.
+        chunksize (int): Pool map chunk size.
+        nfo_files (list of tuple): NFO files as yielded by "_iter_nfo_files".
+
+    Returns:
+        int: Number of NFO files added to the index.
+    """
+    indexed = index.indexed_paths()
+    to_index = [
+        (nfo_file, root_name, media_file, language)
+        for nfo_file, root_name, media_file, language in nfo_files
+        if media_file and (root_name == "tvshow" or media_file not in indexed)
+    ]
+    if not to_index:
+        return 0
+
+    # Main language NFO files are yielded first: Fingerprint media files only once
+    results = pool.map(
+        index.read_media,
+        [nfo_file for nfo_file, _, _, _ in to_index],
+        [root_name for _, root_name, _, _ in to_index],
+        [
+            media_file if root_name != "tvshow" and language == tmdb.LANGUAGE else None
+            for _, root_name, media_file, language in to_index
+        ],
+        chunksize=chunksize,
+    )
+
+    keys = {}
+    count = 0
+    for (_, root_name, media_file, language), result in zip(to_index, results):
+        key, nfo_fields, link = result
+        if nfo_fields is None:
+            continue
+        prefix = tmdb.LINK_PREFIXES[root_name]
+        scraper_id = link[len(prefix) :].split("/", 1)[0]
+        if root_name == "tvshow":
+            index.add_tv_show(scraper_id, nfo_fields, link, language)
+            count += 1
+            continue
+
+        key = keys.setdefault(media_file, key)
+        if key is not None:
+            index.add_media(
+                key,
+                media_file,
+                nfo_fields,
+                link,
+                language,
+                tv_show=scraper_id if root_name == "episodedetails" else None,
+            )
+            count += 1
+    return count
+
+
+def audit(repair_list=REPAIR_LIST):
+    """
+    Check all existing NFO files and write the list of NFO files to repair.
+
+    Valid NFO files are also added to the index.
+
+    Args:
+        repair_list (str): Repair list file path.
+    """
+    print("Auditing NFO files...")
+    nfo_files = []
+    root_names = []
+    valid = []
+    for nfo_file, root_name, media_file, language in _iter_nfo_files():
+        nfo_files.append(nfo_file)
+        root_names.append(root_name)
+        valid.append((nfo_file, root_name, media_file, language))
+    workers = cpu_count() or 1
+    chunksize = max(1, len(nfo_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            audit_nfo,
+            nfo_files,
+            root_names,
+            (tmdb.REQUIRED_FIELDS[root_name] for root_name in root_names),
+            (tmdb.LINK_PREFIXES[root_name] for root_name in root_names),
+            (tmdb.OPTIONAL_FIELDS[root_name] for root_name in root_names),
+            chunksize=chunksize,
+        )
+        to_repair = []
+        incomplete = 0
+        for i, (problems, missing) in enumerate(results):
+            if problems:
+                print(f'"{nfo_files[i]}": {", ".join(problems)}')
+                to_repair.append(nfo_files[i])
+                valid[i] = None
+            elif missing:
+                print(f'"{nfo_files[i]}": no {", ".join(missing)} (Not repaired)')
+                incomplete += 1
+
+        valid = [nfo_file for nfo_file in valid if nfo_file]
+        indexed = _index_nfo_files(pool, chunksize, valid)
+    index.save()
+
+    with open(repair_list, "wt", encoding="utf-8") as file:
+        file.writelines(f"{nfo_file}\n" for nfo_file in to_repair)
+    print(
+        f"{len(nfo_files)} NFO files audited, {incomplete} incomplete, "
+        f'{len(to_repair)} to repair listed in "{repair_list}", {indexed} indexed...'
+    )
+
+
+def load_repair_list(repair_list=REPAIR_LIST):
+    """
+    Load NFO files to regenerate.
+
+    Args:
+        repair_list (str): Repair list file path.
+
+    Raises:
+        FileNotFoundError: No repair list, "--audit" was never run.
+    """
+    with open(repair_list, "rt", encoding="utf-8") as file:
+        _REPAIR.update(line.rstrip("\n") for line in file if line.strip())
+    print(f"{len(_REPAIR)} NFO files to repair...")
+
+
 def _run_command():
     """Entrypoint"""
-    walk_movies()
-    walk_tv_shows()
+    parser = ArgumentParser(
+        prog="movie_nfo_generator", description="Kodi NFO generator"
+    )
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="Check existing NFO files and write the list of NFO files to repair.",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Also regenerate NFO files from the repair list.",
+    )
+    parser.add_argument(
+        "--repair-list",
+        default=REPAIR_LIST,
+        help=f'Repair list file path. Default to "{REPAIR_LIST}".',
+    )
+    args = parser.parse_args()
+
+    if args.audit:
+        audit(args.repair_list)
+        return
+
+    if args.repair:
+        try:
+            load_repair_list(args.repair_list)
+        except FileNotFoundError:
+            parser.error(
+                f'repair list "{args.repair_list}" not found, run with "--audit" first'
+            )
+    try:
+        walk_movies()
+        walk_tv_shows()
+    finally:
+        index.save()
+        print(f"Scraping: {_workers.summary()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+"""Adaptive concurrency"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Condition
+from time import monotonic, sleep
+
+from requests import Session, exceptions
+
+
+class AdaptiveExecutor:
+    """
+    Executor adjusting the number of jobs in flight with AIMD feedback.
+
+    The limit is increased additively on fast successful responses and decreased
+    multiplicatively on slow responses, throttling (HTTP 429), server errors and
+    connection errors.
+
+    Args:
+        min_workers (int): Minimum number of jobs in flight.
+        max_workers (int): Maximum number of jobs in flight.
+        target_latency (float): Response latency above which the limit is decreased,
+            in seconds.
+    """
+
+    #: Multiplicative decrease factor
+    DECREASE_FACTOR = 0.5
+
+    def __init__(self, min_workers, max_workers, target_latency):
+        self._min = max(1, min_workers)
+        self._max = max(self._min, max_workers)
+        self._target_latency = target_latency
+        self._executor = ThreadPoolExecutor(max_workers=self._max)
+        self._condition = Condition()
+        self._limit = float(self._min)
+        self._in_flight = 0
+        self._peak = 0
+        self._completed = 0
+        self._start = None
+        self._last_decrease = 0.0
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Submit a job.
+
+        Args:
+            func (callable): Function to call.
+            args: Function positional arguments.
+            kwargs: Function keyword arguments.
+
+        Returns:
+            concurrent.futures.Future: Job future.
+        """
+        if self._start is None:
+            self._start = monotonic()
+        return self._executor.submit(self._run, func, args, kwargs)
+
+    def _run(self, func, args, kwargs):
+        """
+        Run a job once the limit allows it.
+
+        Args:
+            func (callable): Function to call.
+            args (tuple): Function positional arguments.
+            kwargs (dict): Function keyword arguments.
+
+        Returns:
+            object: Function result.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            self._peak = max(self._peak, self._in_flight)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._completed += 1
+                self._condition.notify_all()
+
+    def _increase(self):
+        """Additive increase: one more job in flight per limit successes"""
+        with self._condition:
+            self._limit = min(self._max, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def record_error(self):
+        """Multiplicative decrease, at most once per target latency"""
+        with self._condition:
+            now = monotonic()
+            if now - self._last_decrease < self._target_latency:
+                return
+            self._last_decrease = now
+            self._limit = max(self._min, self._limit * self.DECREASE_FACTOR)
+
+    def record_response(self, response, *_, **__):
+        """
+        Feedback from an HTTP response ("requests" response hook).
+
+        Args:
+            response (requests.Response): Response.
+        """
+        if (
+            response.status_code == 429
+            or response.status_code >= 500
+            or response.elapsed.total_seconds() > self._target_latency
+        ):
+            self.record_error()
+        elif response.ok:
+            self._increase()
+
+    def summary(self):
+        """
+        Return throughput summary.
+
+        Returns:
+            str: Summary.
+        """
+        elapsed = monotonic() - self._start if self._start is not None else 0.0
+        throughput = self._completed / elapsed if elapsed else 0.0
+        return (
+            f"{self._completed} jobs in {elapsed:.1f}s ({throughput:.2f} jobs/s), "
+            f"up to {self._peak} in flight, final limit {int(self._limit)}"
+        )
+
+
+def _retry_delay(response, default):
+    """
+    Return the delay to wait before retrying a request.
+
+    Args:
+        response (requests.Response): Response.
+        default (float): Delay to use if the response has no "Retry-After" header.
+
+    Returns:
+        float: Delay in seconds.
+    """
+    retry_after = response.headers.get("Retry-After", "").strip()
+    if not retry_after:
+        return default
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetrySession(Session):
+    """
+    Session retrying throttled, failed and timed out requests with backoff.
+
+    The executor limit is decreased before any retry. The "Retry-After" header is
+    honoured if present, and the last response is returned if all retries failed.
+
+    Args:
+        executor (AdaptiveExecutor): Executor to notify of errors.
+        retries (int): Maximum number of retries.
+        backoff (float): Delay before the first retry, doubled on each retry, in
+            seconds.
+    """
+
+    #: HTTP status to retry
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    #: Maximum delay between retries, in seconds
+    MAX_DELAY = 60.0
+
+    def __init__(self, executor, retries=5, backoff=1.0):
+        Session.__init__(self)
+        self._executor = executor
+        self._retries = retries
+        self._backoff = backoff
+
+    def request(self, *args, **kwargs):
+        """
+        Send a request, with retries.
+
+        The "Connection: close" header is dropped to keep connections alive.
+
+        Args:
+            args: "requests.Session.request" positional arguments.
+            kwargs: "requests.Session.request" keyword arguments.
+
+        Returns:
+            requests.Response: Response.
+        """
+        headers = kwargs.get("headers")
+        if headers:
+            kwargs["headers"] = {
+                key: value
+                for key, value in headers.items()
+                if key.lower() != "connection"
+            }
+
+        for retry in range(self._retries + 1):
+            delay = self._backoff * 2 ** retry
+            try:
+                response = Session.request(self, *args, **kwargs)
+            except (exceptions.ConnectionError, exceptions.Timeout):
+                self._executor.record_error()
+                if retry == self._retries:
+                    raise
+            else:
+                # Throttling and server errors already decreased the executor limit
+                # from the response hook
+                if response.status_code not in self.RETRY_STATUS or (
+                    retry == self._retries
+                ):
+                    return response
+                delay = _retry_delay(response, delay)
+            sleep(min(delay, self.MAX_DELAY))
@@ -35,6 +35,18 @@ if not INI.has_section("Tv Shows"):
 if not INI.has_option("General", "formats"):
     ini_set("General", "formats", ".mkv .mk3d")
 
+if not INI.has_option("General", "min_workers"):
+    ini_set("General", "min_workers", "1")
+
+if not INI.has_option("General", "max_workers"):
+    ini_set("General", "max_workers", "8")
+
+if not INI.has_option("General", "target_latency"):
+    ini_set("General", "target_latency", "1.0")
+
+if not INI.has_option("General", "timeout"):
+    ini_set("General", "timeout", "30")
+
 if not INI.has_option("General", "language"):
     LANGUAGE = ""
     while not LANGUAGE:
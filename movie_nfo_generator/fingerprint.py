@@ -0,0 +1,359 @@
+"""Media files fingerprint index"""
+from functools import lru_cache
+from hashlib import blake2b
+from json import dump, load
+from os import fstat, replace
+from os.path import exists, join
+from threading import Lock
+
+from movie_nfo_generator.config import CONFIG_DIR
+from movie_nfo_generator.nfo import read_nfo
+
+#: Index file
+INDEX_FILE = join(CONFIG_DIR, "fingerprints.json")
+
+#: Size of blocks read at start and end of media files
+BLOCK_SIZE = 65536
+
+#: NFO fields depending on the media location, never cached
+LOCATION_FIELDS = ("set", "sorttitle", "displayepisode", "displayseason")
+
+_LOCK = Lock()
+
+
+def _load():
+    """
+    Load the index file.
+
+    Returns:
+        dict: Index.
+    """
+    if exists(INDEX_FILE):
+        with open(INDEX_FILE, "rt", encoding="utf-8") as index_file:
+            return load(index_file)
+    return {"files": {}, "tv_shows": {}}
+
+
+_INDEX = {}
+
+
+def _index():
+    """
+    Return the index, loaded on first use (Not in audit worker processes).
+
+    Returns:
+        dict: Index.
+    """
+    if not _INDEX:
+        _INDEX.update(_load())
+    return _INDEX
+
+
+def save():
+    """Save the index file"""
+    with _LOCK:
+        with open(f"{INDEX_FILE}.tmp", "wt", encoding="utf-8") as index_file:
+            dump(_index(), index_file, ensure_ascii=False)
+        replace(f"{INDEX_FILE}.tmp", INDEX_FILE)
+
+
+@lru_cache(maxsize=None)
+def fingerprint(media_file):
+    """
+    Return a media file fingerprint.
+
+    Only the file size and fixed blocks at start and end of file are used, so the
+    file is never fully read.
+
+    Args:
+        media_file (str): Media file path.
+
+    Returns:
+        str: Fingerprint, or None if the file cannot be read.
+    """
+    hasher = blake2b(digest_size=16)
+    try:
+        with open(media_file, "rb") as file:
+            size = fstat(file.fileno()).st_size
+            hasher.update(file.read(BLOCK_SIZE))
+            if size > BLOCK_SIZE:
+                file.seek(max(BLOCK_SIZE, size - BLOCK_SIZE))
+                hasher.update(file.read(BLOCK_SIZE))
+    except OSError:
+        return None
+    return f"{size:x}-{hasher.hexdigest()}"
+
+
+def _copy_fields(nfo_fields, languages):
+    """
+    Copy NFO fields.
+
+    Args:
+        nfo_fields (dict): Fields by language.
+        languages (iterable of str): Languages to copy.
+
+    Returns:
+        dict: Fields by language.
+    """
+    return {language: dict(nfo_fields[language]) for language in languages}
+
+
+def _get(section, key, languages):
+    """
+    Return cached NFO fields.
+
+    Args:
+        section (str): Index section.
+        key (str): Entry key.
+        languages (iterable of str): Required languages. None to get all cached
+            languages.
+
+    Returns:
+        dict: Entry with fields copied, or None if not cached for all languages.
+    """
+    if key is None:
+        return None
+    with _LOCK:
+        entry = _index()[section].get(key)
+        if entry is None:
+            return None
+        if languages is None:
+            languages = tuple(entry["fields"])
+        elif any(language not in entry["fields"] for language in languages):
+            return None
+        entry = entry.copy()
+        entry["fields"] = _copy_fields(entry["fields"], languages)
+        return entry
+
+
+def _set(section, key, nfo_fields, languages, refresh=False, **values):
+    """
+    Cache NFO fields.
+
+    Args:
+        section (str): Index section.
+        key (str): Entry key.
+        nfo_fields (dict): Fields by language.
+        languages (iterable of str): Languages to cache.
+        refresh (bool): If True, replace the existing entry instead of updating it.
+        values: Other entry values.
+    """
+    if key is None:
+        return
+    with _LOCK:
+        if refresh:
+            _index()[section][key] = {"fields": {}}
+        entry = _index()[section].setdefault(key, {"fields": {}})
+        entry["fields"].update(_copy_fields(nfo_fields, languages))
+        entry.update(values)
+
+
+def get_media(media_file, languages):
+    """
+    Return cached NFO fields for a media file.
+
+    Args:
+        media_file (str): Media file path.
+        languages (iterable of str): Required languages, None for all.
+
+    Returns:
+        dict: Entry with "fields" by language, "link" and "tv_show" ID for episodes.
+            None if not cached.
+    """
+    return _get("files", fingerprint(media_file), languages)
+
+
+def set_media(media_file, nfo_fields, link, languages, tv_show=None, refresh=False):
+    """
+    Cache NFO fields for a media file.
+
+    Args:
+        media_file (str): Media file path.
+        nfo_fields (dict): Fields by language.
+        link (str): Scrapper URL link.
+        languages (iterable of str): Languages to cache.
+        tv_show (str): TV show scrapper ID, for episodes.
+        refresh (bool): If True, replace the existing entry.
+    """
+    _set(
+        "files",
+        fingerprint(media_file),
+        nfo_fields,
+        languages,
+        refresh,
+        link=link,
+        tv_show=None if tv_show is None else str(tv_show),
+        path=media_file,
+    )
+
+
+def get_episode(media_file, languages, scraper_id, season_num, episode_num):
+    """
+    Return cached NFO fields for a TV episode.
+
+    The entry is used only if it matches the TV show, and the season and episode
+    numbers from the file name (A renamed file keeps its fingerprint).
+
+    Args:
+        media_file (str): Media file path.
+        languages (iterable of str): Required languages, None for all.
+        scraper_id (str): TV show scrapper ID.
+        season_num (int): Season number.
+        episode_num (int): Episode Number.
+
+    Returns:
+        dict: Entry with "fields" by language and "link". None if not cached.
+    """
+    entry = get_media(media_file, languages)
+    if entry is None or entry["tv_show"] != str(scraper_id):
+        return None
+    for nfo_fields in entry["fields"].values():
+        numbers = str(nfo_fields.get("season")), str(nfo_fields.get("episode"))
+        if numbers != (str(season_num), str(episode_num)):
+            return None
+    return entry
+
+
+def indexed_paths():
+    """
+    Return paths of indexed media files.
+
+    Returns:
+        set of str: Media files paths.
+    """
+    with _LOCK:
+        return {
+            entry["path"] for entry in _index()["files"].values() if entry.get("path")
+        }
+
+
+def read_media(nfo_file, root_name, media_file=None):
+    """
+    Read an existing NFO file and fingerprint its media file.
+
+    This is used to fill the index from existing NFO files in worker processes.
+
+    Args:
+        nfo_file (str): NFO file path.
+        root_name (str): NFO root name.
+        media_file (str): Media file path.
+
+    Returns:
+        tuple: Fingerprint (None if no media file or unreadable), fields (None if
+            the NFO file is invalid), scrapper URL link.
+    """
+    try:
+        nfo_fields, link = read_nfo(nfo_file, root_name)
+    except (OSError, ValueError):
+        return None, None, ""
+    for field in LOCATION_FIELDS:
+        nfo_fields.pop(field, None)
+    return fingerprint(media_file) if media_file else None, nfo_fields, link
+
+
+def add_media(key, media_file, nfo_fields, link, language, tv_show=None):
+    """
+    Cache NFO fields read from an existing NFO file, if not already cached for this
+    language.
+
+    Args:
+        key (str): Media file fingerprint.
+        media_file (str): Media file path.
+        nfo_fields (dict): Fields.
+        link (str): Scrapper URL link.
+        language (str): Fields language.
+        tv_show (str): TV show scrapper ID, for episodes.
+    """
+    if key is None:
+        return
+    with _LOCK:
+        entry = _index()["files"].setdefault(
+            key,
+            {
+                "fields": {},
+                "link": link,
+                "tv_show": None if tv_show is None else str(tv_show),
+                "path": media_file,
+            },
+        )
+        entry["fields"].setdefault(language, nfo_fields)
+
+
+def add_tv_show(scraper_id, nfo_fields, link, language):
+    """
+    Cache TV show NFO fields read from an existing NFO file, if not already cached
+    for this language.
+
+    Args:
+        scraper_id (str): TV show scrapper ID.
+        nfo_fields (dict): Fields.
+        link (str): Scrapper URL link.
+        language (str): Fields language.
+    """
+    with _LOCK:
+        entry = _index()["tv_shows"].setdefault(
+            str(scraper_id),
+            {"fields": {}, "link": link, "original_language": None},
+        )
+        entry["fields"].setdefault(language, nfo_fields)
+
+
+def get_tv_show(scraper_id, languages):
+    """
+    Return cached NFO fields for a TV show.
+
+    Args:
+        scraper_id (str): TV show scrapper ID.
+        languages (iterable of str): Required languages, None for all.
+
+    Returns:
+        dict: Entry with "fields" by language, "link" and "original_language".
+            None if not cached.
+    """
+    return _get("tv_shows", str(scraper_id), languages)
+
+
+def set_tv_show(
+    scraper_id, nfo_fields, link, languages, original_language, refresh=False
+):
+    """
+    Cache NFO fields for a TV show.
+
+    Args:
+        scraper_id (str): TV show scrapper ID.
+        nfo_fields (dict): Fields by language.
+        link (str): Scrapper URL link.
+        languages (iterable of str): Languages to cache.
+        original_language (str): Original language.
+        refresh (bool): If True, replace the existing entry.
+    """
+    _set(
+        "tv_shows",
+        str(scraper_id),
+        nfo_fields,
+        languages,
+        refresh,
+        link=link,
+        original_language=original_language,
+    )
+
+
+def find_tv_show(media_files):
+    """
+    Return the TV show scrapper ID of the first indexed episode.
+
+    Args:
+        media_files (iterable of str): Episodes media files paths.
+
+    Returns:
+        str: TV show scrapper ID, or None if no episode is indexed.
+    """
+    for media_file in media_files:
+        key = fingerprint(media_file)
+        if key is None:
+            continue
+        with _LOCK:
+            entry = _index()["files"].get(key)
+        if entry is not None and entry.get("tv_show") is not None:
+            return entry["tv_show"]
+    return None
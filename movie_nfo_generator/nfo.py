@@ -1,6 +1,8 @@
 """NFO file utilities"""
-from lxml.etree import Element, SubElement, ElementTree
-from os.path import join
+from io import BytesIO
+from lxml.etree import Element, SubElement, ElementTree, XMLSyntaxError, iterparse
+from os import makedirs
+from os.path import dirname, join
 
 
 def write_nfo(root_name, nfo_fields, media_filename, link="", filename=None):
@@ -17,7 +19,7 @@ def write_nfo(root_name, nfo_fields, media_filename, link="", filename=None):
     nfo_root = Element(root_name)
 
     for field_name, values in nfo_fields.items():
-        if not values:
+        if values is None or values == "" or values == []:
             continue
         if not isinstance(values, list):
             values = [values]
@@ -28,6 +30,7 @@ def write_nfo(root_name, nfo_fields, media_filename, link="", filename=None):
         filename = f"{media_filename}.nfo"
     else:
         filename = join(media_filename, filename)
+    makedirs(dirname(filename), exist_ok=True)
 
     ElementTree(nfo_root).write(
         filename, encoding="utf-8", xml_declaration=True, pretty_print=True
@@ -36,3 +39,90 @@ def write_nfo(root_name, nfo_fields, media_filename, link="", filename=None):
     if link:
         with open(filename, "at") as nfo_file:
             nfo_file.write(link)
+
+
+def read_nfo(nfo_filename, root_name):
+    """
+    Read an NFO file.
+
+    The file is read with a single call (NFO files are small, and this is the cheapest
+    access pattern on network file systems) and parsed incrementally without building
+    the element tree.
+
+    Args:
+        nfo_filename (str): NFO file path.
+        root_name (str): Expected NFO root name.
+
+    Returns:
+        tuple: Fields (dict, with a list for repeated fields), scrapper URL link.
+
+    Raises:
+        OSError: Unreadable file.
+        ValueError: Invalid NFO file.
+    """
+    with open(nfo_filename, "rb") as nfo_file:
+        content = nfo_file.read()
+
+    xml, end_tag, link = content.rpartition(f"</{root_name}>".encode())
+    if not end_tag:
+        raise ValueError("truncated or invalid root")
+
+    nfo_fields = {}
+    depth = 0
+    events = ("start", "end")
+    try:
+        for event, element in iterparse(BytesIO(xml + end_tag), events=events):
+            if event == "start":
+                if not depth and element.tag != root_name:
+                    raise ValueError(f'invalid root "{element.tag}"')
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                text = (element.text or "").strip()
+                if text:
+                    values = nfo_fields.get(element.tag)
+                    if values is None:
+                        nfo_fields[element.tag] = text
+                    elif isinstance(values, list):
+                        values.append(text)
+                    else:
+                        nfo_fields[element.tag] = [values, text]
+                element.clear()
+    except XMLSyntaxError as exception:
+        raise ValueError(f"invalid XML ({exception})")
+
+    return nfo_fields, link.decode(errors="replace").strip()
+
+
+def audit_nfo(
+    nfo_filename, root_name, required_fields=(), link_prefix="", optional_fields=()
+):
+    """
+    Check an existing NFO file.
+
+    Args:
+        nfo_filename (str): NFO file path.
+        root_name (str): Expected NFO root name.
+        required_fields (iterable of str): Fields that must be present and not empty.
+        link_prefix (str): Expected scrapper URL link prefix.
+        optional_fields (iterable of str): Fields that may be missing if not
+            available from the scrapper.
+
+    Returns:
+        tuple of list of str: Problems found (Empty if the NFO file is valid),
+            missing optional fields.
+    """
+    try:
+        nfo_fields, link = read_nfo(nfo_filename, root_name)
+    except OSError as exception:
+        return [f"unreadable ({exception})"], []
+    except ValueError as exception:
+        return [str(exception)], []
+
+    problems = [
+        f"missing {field}" for field in required_fields if field not in nfo_fields
+    ]
+    if link_prefix and not link.startswith(link_prefix):
+        problems.append("missing scrapper link")
+    return problems, [field for field in optional_fields if field not in nfo_fields]
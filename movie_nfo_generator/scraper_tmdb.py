@@ -2,7 +2,7 @@
 
 import tmdbsimple as tmdb
 from movie_nfo_generator.config import INI, ini_set
-from movie_nfo_generator.utilities import choose_result
+from movie_nfo_generator.utilities import UI_LOCK, choose_result
 
 if not INI.has_section("TMDB"):
     INI.add_section("TMDB")
@@ -13,9 +13,44 @@ if not INI.has_option("TMDB", "API_KEY"):
         API_KEY = input('Enter "The Movie Database" API key: ').strip()
     ini_set("TMDB", "API_KEY", API_KEY)
 tmdb.API_KEY = INI.get("TMDB", "API_KEY")
+tmdb.REQUESTS_TIMEOUT = INI.getfloat("General", "timeout")
 
 LANGUAGE = INI.get("General", "language")
 
+#: The Movie Database website URL
+URL = "https://www.themoviedb.org"
+
+#: Scrapper links prefixes, by NFO root name
+LINK_PREFIXES = {
+    "movie": f"{URL}/movie/",
+    "tvshow": f"{URL}/tv/",
+    "episodedetails": f"{URL}/tv/",
+}
+
+#: Fields always produced for a complete NFO, by NFO root name
+REQUIRED_FIELDS = {
+    "movie": ("title", "originaltitle"),
+    "tvshow": ("title", "originaltitle"),
+    "episodedetails": ("title", "episode"),
+}
+
+#: Fields produced only if available on The Movie Database, by NFO root name
+OPTIONAL_FIELDS = {
+    "movie": ("plot",),
+    "tvshow": ("plot",),
+    "episodedetails": ("plot",),
+}
+
+
+def use_session(session):
+    """
+    Use a session for all requests.
+
+    Args:
+        session (requests.Session): Session.
+    """
+    tmdb.REQUESTS_SESSION = session
+
 
 def _search(title, search_method, title_key, date_key, year_query, year):
     """
@@ -44,18 +79,22 @@ def _search(title, search_method, title_key, date_key, year_query, year):
             if year_query in search_params:
                 del search_params[year_query]
                 continue
-            search_params["query"] = input("No matching result, enter title: ")
-
-    return choose_result(
-        [
-            {
-                "title": result[title_key],
-                "year": result[date_key].split("-", 1)[0],
-                "id": result["id"],
-            }
-            for result in results
-        ]
-    )
+            with UI_LOCK:
+                search_params["query"] = input(
+                    f'No matching result for "{title}", enter title: '
+                )
+
+    with UI_LOCK:
+        return choose_result(
+            [
+                {
+                    "title": result[title_key],
+                    "year": result[date_key].split("-", 1)[0],
+                    "id": result["id"],
+                }
+                for result in results
+            ]
+        )
 
 
 def search_movie(title, year):
@@ -119,22 +158,78 @@ def _crew_member_by_job(credits, job):
     return names
 
 
-def get_movie_infos(title, year):
+def _translation(infos, language):
+    """
+    Return translated data for a language
+
+    Args:
+        infos (dict): Response with appended translations.
+        language (str): Language code (ISO 639-1, optionally with ISO 3166-1 region).
+
+    Returns:
+        dict: Translated data, empty if not available.
+    """
+    code, _, region = language.lower().partition("-")
+    matches = [
+        translation
+        for translation in infos["translations"]["translations"]
+        if translation["iso_639_1"].lower() == code
+    ]
+    for translation in matches:
+        if translation["iso_3166_1"].lower() == region:
+            return translation["data"]
+    return matches[0]["data"] if matches else {}
+
+
+def _translate(nfo_fields, infos, languages, translated_fields):
+    """
+    Return NFO fields by language
+
+    Untranslated titles fall back to the original title, other untranslated fields
+    are left empty to never mix languages. Fields that are not translatable are kept
+    from the main language.
+
+    Args:
+        nfo_fields (dict): Fields in main language.
+        infos (dict): Response with appended translations.
+        languages (iterable of str): Languages.
+        translated_fields (dict): Translation data key by field name.
+
+    Returns:
+        dict: Fields by language.
+    """
+    fields_by_language = {LANGUAGE: nfo_fields}
+    for language in languages:
+        if language == LANGUAGE:
+            continue
+        translation = _translation(infos, language)
+        fields = nfo_fields.copy()
+        for field, key in translated_fields.items():
+            fallback = nfo_fields.get("originaltitle", "") if field == "title" else ""
+            fields[field] = translation.get(key) or fallback
+        fields_by_language[language] = fields
+    return fields_by_language
+
+
+def get_movie_infos(title=None, year=None, languages=(), tmdb_id=None):
     """
     Return NFO fields and link for a movie.
 
     Args:
         title (str): Movie title.
         year (int or str): Movie year.
+        languages (iterable of str): Additional languages.
+        tmdb_id (str): The Movie Database ID.
 
     Returns:
-        tuple: Fields, The Movie Database URL.
+        tuple: Fields by language, The Movie Database URL.
     """
-    tmdb_id = search_movie(title, year)
+    if not tmdb_id:
+        tmdb_id = search_movie(title, year)
 
     movie = tmdb.Movies(tmdb_id)
-    infos = movie.info(language=LANGUAGE)
-    credits = movie.credits(language=LANGUAGE)
+    infos = movie.info(language=LANGUAGE, append_to_response="credits,translations")
+    credits = infos["credits"]
 
     nfo_fields = {
         "title": infos["title"],
@@ -150,10 +245,23 @@ def get_movie_infos(title, year):
         "credits": _crew_member_by_job(credits, "novel"),
     }
 
-    return nfo_fields, f"https://www.themoviedb.org/movie/{tmdb_id}"
+    return (
+        _translate(
+            nfo_fields,
+            infos,
+            languages,
+            {
+                "title": "title",
+                "plot": "overview",
+                "outline": "overview",
+                "tagline": "tagline",
+            },
+        ),
+        f"{URL}/movie/{tmdb_id}",
+    )
 
 
-def get_tv_show_infos(title=None, year=None, tmdb_id=None):
+def get_tv_show_infos(title=None, year=None, tmdb_id=None, languages=()):
     """
     Return NFO fields and link for a TV show.
 
@@ -161,15 +269,17 @@ def get_tv_show_infos(title=None, year=None, tmdb_id=None):
         title (str): TV show title.
         year (int or str): TV show start year.
         tmdb_id (str): The Movie Database ID.
+        languages (iterable of str): Additional languages.
 
     Returns:
-        tuple: Fields, The Movie Database URL, The Movie Database ID, original language
+        tuple: Fields by language, The Movie Database URL, The Movie Database ID,
+            original language
     """
     if not tmdb_id:
         tmdb_id = search_tv_show(title, year)
 
     serie = tmdb.TV(tmdb_id)
-    infos = serie.info(language=LANGUAGE)
+    infos = serie.info(language=LANGUAGE, append_to_response="translations")
 
     nfo_fields = {
         "title": infos["name"],
@@ -182,14 +292,21 @@ def get_tv_show_infos(title=None, year=None, tmdb_id=None):
     }
 
     return (
-        nfo_fields,
-        f"https://www.themoviedb.org/tv/{tmdb_id}",
+        _translate(
+            nfo_fields,
+            infos,
+            languages,
+            {"title": "name", "plot": "overview", "outline": "overview"},
+        ),
+        f"{URL}/tv/{tmdb_id}",
         tmdb_id,
         infos["original_language"],
     )
 
 
-def get_tv_episode_infos(tmdb_id, season_num, episode_num, original_language):
+def get_tv_episode_infos(
+    tmdb_id, season_num, episode_num, original_language, languages=()
+):
     """
     Return NFO fields and link for a TV episode.
 
@@ -198,18 +315,19 @@ def get_tv_episode_infos(tmdb_id, season_num, episode_num, original_language):
         season_num (int): Season number.
         episode_num (int): Episode Number.
         original_language (str): Original language.
+        languages (iterable of str): Additional languages.
 
     Returns:
-        tuple: Fields, The Movie Database URL.
+        tuple: Fields by language, The Movie Database URL.
     """
 
     episode = tmdb.TV_Episodes(tmdb_id, season_num, episode_num)
-    infos = episode.info(language=LANGUAGE)
-    original_info = episode.info(language=original_language)
+    infos = episode.info(language=LANGUAGE, append_to_response="translations")
 
     nfo_fields = {
         "title": infos["name"],
-        "originaltitle": original_info["name"],
+        "originaltitle": _translation(infos, original_language).get("name")
+        or infos["name"],
         "season": infos["season_number"],
         "episode": infos["episode_number"],
         "plot": infos["overview"],
@@ -217,7 +335,9 @@ def get_tv_episode_infos(tmdb_id, season_num, episode_num, original_language):
     }
 
     return (
-        nfo_fields,
-        f"https://www.themoviedb.org/tv/{tmdb_id}"
+        _translate(
+            nfo_fields, infos, languages, {"title": "name", "plot": "overview"}
+        ),
+        f"{URL}/tv/{tmdb_id}"
         f"/season/{season_num}/episode/{episode_num}",
     )
@@ -1,5 +1,9 @@
 """Utilities"""
 from os.path import basename
+from threading import Lock
+
+#: Lock to hold while interacting with the user
+UI_LOCK = Lock()
 
 
 def choose_result(results):
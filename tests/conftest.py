@@ -0,0 +1,30 @@
+"""Tests configuration"""
+from os import environ, makedirs
+from os.path import join
+from tempfile import mkdtemp
+
+#: Configuration directory with all options set, to never prompt on modules import
+CONFIG_HOME = mkdtemp()
+makedirs(join(CONFIG_HOME, "movie_nfo_generator"))
+with open(join(CONFIG_HOME, "movie_nfo_generator", "config.ini"), "wt") as ini_file:
+    ini_file.write(
+        f"""[General]
+formats = .mkv
+language = fr
+min_workers = 1
+max_workers = 2
+target_latency = 1.0
+timeout = 30
+
+[Movies]
+path = {CONFIG_HOME}
+
+[Tv Shows]
+path = {CONFIG_HOME}
+
+[TMDB]
+api_key = test
+"""
+    )
+environ["XDG_CONFIG_HOME"] = CONFIG_HOME
+environ["APPDATA"] = CONFIG_HOME
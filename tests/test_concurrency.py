@@ -0,0 +1,141 @@
+"""Tests for adaptive concurrency"""
+from datetime import timedelta
+
+import pytest
+from requests import Response, Session, exceptions
+
+import movie_nfo_generator.concurrency as concurrency
+from movie_nfo_generator.concurrency import AdaptiveExecutor, RetrySession
+
+
+def _response(status_code=200, latency=0.01, headers=None):
+    """Return a response"""
+    response = Response()
+    response.status_code = status_code
+    response.elapsed = timedelta(seconds=latency)
+    response.headers.update(headers or {})
+    return response
+
+
+def test_increase():
+    """Test additive increase, clamped to maximum"""
+    executor = AdaptiveExecutor(1, 4, 1.0)
+    assert executor._limit == 1
+
+    # Client errors are not feedback
+    executor.record_response(_response(404))
+    assert executor._limit == 1
+
+    executor.record_response(_response())
+    assert executor._limit == 2
+    executor.record_response(_response())
+    assert executor._limit == 2.5
+
+    for _ in range(100):
+        executor.record_response(_response())
+    assert executor._limit == 4
+
+
+def test_decrease():
+    """Test multiplicative decrease, clamped to minimum"""
+    executor = AdaptiveExecutor(2, 8, 0.0)
+    executor._limit = 8.0
+
+    executor.record_response(_response(429))
+    assert executor._limit == 4
+    executor.record_response(_response(503))
+    assert executor._limit == 2
+    executor.record_response(_response(latency=1.0))
+    assert executor._limit == 2
+
+
+def test_decrease_once_per_target_latency():
+    """Test a burst of errors decreases the limit only once"""
+    executor = AdaptiveExecutor(1, 8, 60.0)
+    executor._limit = 8.0
+    for _ in range(5):
+        executor.record_response(_response(429))
+    assert executor._limit == 4
+
+
+def test_limits():
+    """Test minimum and maximum sanitization"""
+    executor = AdaptiveExecutor(0, 0, 1.0)
+    assert (executor._min, executor._max) == (1, 1)
+
+
+def test_submit():
+    """Test jobs in flight never exceed the limit"""
+    executor = AdaptiveExecutor(2, 2, 1.0)
+    futures = [executor.submit(pow, value, 2) for value in range(10)]
+    assert [future.result() for future in futures] == [
+        value ** 2 for value in range(10)
+    ]
+    assert executor._peak <= 2
+    assert executor.summary().startswith("10 jobs")
+
+
+def test_retry_delay():
+    """Test "Retry-After" header parsing"""
+    retry_delay = concurrency._retry_delay
+    assert retry_delay(_response(429), 1.0) == 1.0
+    assert retry_delay(_response(429, headers={"Retry-After": "5"}), 1.0) == 5.0
+    assert retry_delay(_response(429, headers={"Retry-After": "bad"}), 1.0) == 1.0
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert retry_delay(_response(429, headers={"Retry-After": past}), 1.0) == 0.0
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """Return a retry session with mocked requests and sleep"""
+    delays = []
+    monkeypatch.setattr(concurrency, "sleep", delays.append)
+    executor = AdaptiveExecutor(1, 8, 0.0)
+    executor._limit = 8.0
+    retry_session = RetrySession(executor, retries=2, backoff=1.0)
+    retry_session.hooks["response"].append(executor.record_response)
+    return retry_session, executor, delays
+
+
+def _mock_request(monkeypatch, results, calls):
+    """Mock "Session.request" to return or raise results"""
+
+    def request(self, *_, **kwargs):
+        calls.append(kwargs)
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return self.hooks["response"][0](result) or result
+
+    monkeypatch.setattr(Session, "request", request)
+
+
+def test_retry_session(session, monkeypatch):
+    """Test throttled requests are retried after the limit decreased"""
+    retry_session, executor, delays = session
+    calls = []
+    _mock_request(
+        monkeypatch,
+        [_response(429, headers={"Retry-After": "3"}), _response(502), _response()],
+        calls,
+    )
+    response = retry_session.request(
+        "GET", "https://host", headers={"Connection": "close", "Accept": "json"}
+    )
+    assert response.status_code == 200
+    assert delays == [3.0, 2.0]
+    assert executor._limit < 8
+    assert calls[0]["headers"] == {"Accept": "json"}
+
+
+def test_retry_session_exhausted(session, monkeypatch):
+    """Test last response is returned and last error raised"""
+    retry_session, executor, delays = session
+    _mock_request(monkeypatch, [_response(429)] * 3, [])
+    assert retry_session.request("GET", "https://host").status_code == 429
+    assert delays == [1.0, 2.0]
+
+    _mock_request(monkeypatch, [exceptions.Timeout()] * 3, [])
+    with pytest.raises(exceptions.Timeout):
+        retry_session.request("GET", "https://host")
+    assert executor._limit == 1
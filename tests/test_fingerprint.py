@@ -0,0 +1,129 @@
+"""Tests for media files fingerprint index"""
+import pytest
+
+import movie_nfo_generator.fingerprint as index
+from movie_nfo_generator.nfo import write_nfo
+
+#: Fingerprint without cache, to fingerprint modified files again
+fingerprint = index.fingerprint.__wrapped__
+
+
+@pytest.fixture(autouse=True)
+def empty_index(monkeypatch):
+    """Use an empty index"""
+    monkeypatch.setattr(index, "_INDEX", {"files": {}, "tv_shows": {}})
+
+
+def _write(path, content):
+    """Write a file and return its path"""
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_fingerprint_small_file(tmp_path):
+    """Test files smaller than one block"""
+    media_file = _write(tmp_path / "small.mkv", b"a" * 100)
+    assert fingerprint(media_file).startswith("64-")
+    assert fingerprint(media_file) == fingerprint(
+        _write(tmp_path / "copy.mkv", b"a" * 100)
+    )
+    assert fingerprint(media_file) != fingerprint(
+        _write(tmp_path / "other.mkv", b"b" * 100)
+    )
+
+
+def test_fingerprint_large_file(tmp_path):
+    """Test only size, head and tail blocks of large files are used"""
+    block = index.BLOCK_SIZE
+    content = bytearray(b"a" * block * 3)
+    media_file = _write(tmp_path / "large.mkv", content)
+    reference = fingerprint(media_file)
+
+    content[block + 1] = ord("b")
+    assert fingerprint(_write(tmp_path / "large.mkv", content)) == reference
+
+    for position in (0, len(content) - 1):
+        changed = bytearray(content)
+        changed[position] = ord("c")
+        assert fingerprint(_write(tmp_path / "large.mkv", changed)) != reference
+
+    assert fingerprint(_write(tmp_path / "large.mkv", content + b"a")) != reference
+
+
+def test_fingerprint_unreadable(tmp_path):
+    """Test unreadable files are not indexed"""
+    media_file = str(tmp_path / "missing.mkv")
+    assert fingerprint(media_file) is None
+    index.set_media(media_file, {"fr": {"title": "Titre"}}, "link", ("fr",))
+    assert index.get_media(media_file, ("fr",)) is None
+    assert index._INDEX["files"] == {}
+
+
+def test_media_hit_and_miss(tmp_path):
+    """Test cached fields are returned only for all required languages"""
+    media_file = _write(tmp_path / "movie.mkv", b"movie")
+    nfo_fields = {"fr": {"title": "Titre"}, "de": {"title": "Titel"}}
+    index.set_media(media_file, nfo_fields, "link", ("fr",))
+
+    moved_file = _write(tmp_path / "moved.mkv", b"movie")
+    cached = index.get_media(moved_file, ("fr",))
+    assert cached["fields"] == {"fr": {"title": "Titre"}}
+    assert cached["link"] == "link"
+    assert index.get_media(moved_file, ("fr", "de")) is None
+
+    # Cached fields are copies
+    cached["fields"]["fr"]["set"] = "Set"
+    assert "set" not in index.get_media(moved_file, ("fr",))["fields"]["fr"]
+
+    # Refresh replaces other languages
+    index.set_media(media_file, nfo_fields, "link", ("de",))
+    assert index.get_media(media_file, ("fr", "de")) is not None
+    index.set_media(media_file, nfo_fields, "link2", ("de",), refresh=True)
+    assert index.get_media(media_file, ("fr",)) is None
+    assert index.get_media(media_file, ("de",))["link"] == "link2"
+
+
+def test_episode_hit_and_miss(tmp_path):
+    """Test episodes match TV show, season and episode numbers"""
+    media_file = _write(tmp_path / "episode.mkv", b"episode")
+    nfo_fields = {"fr": {"title": "Titre", "season": 1, "episode": 2}}
+    index.set_media(media_file, nfo_fields, "link", ("fr",), tv_show=10)
+
+    assert index.get_episode(media_file, ("fr",), "10", 1, 2) is not None
+    assert index.get_episode(media_file, ("fr",), 10, 1, 2) is not None
+    assert index.get_episode(media_file, ("fr",), 11, 1, 2) is None
+    assert index.get_episode(media_file, ("fr",), 10, 1, 3) is None
+    assert index.get_episode(media_file, ("fr",), 10, 2, 2) is None
+
+
+def test_index_existing_nfo(tmp_path):
+    """Test filling the index from existing NFO files"""
+    media_file = _write(tmp_path / "01 - Episode.S01E02.mkv", b"episode")
+    link = "https://www.themoviedb.org/tv/10/season/1/episode/2"
+    write_nfo(
+        "episodedetails",
+        {"title": "Titre", "season": 1, "episode": 2, "displayepisode": "1"},
+        media_file[:-4],
+        link=link,
+    )
+
+    key, nfo_fields, nfo_link = index.read_media(
+        f"{media_file[:-4]}.nfo", "episodedetails", media_file
+    )
+    assert key == index.fingerprint(media_file)
+    assert nfo_fields == {"title": "Titre", "season": "1", "episode": "2"}
+    assert nfo_link == link
+
+    index.add_media(key, media_file, nfo_fields, nfo_link, "fr", tv_show="10")
+    de_fields = dict(nfo_fields, title="Titel")
+    index.add_media(key, media_file, de_fields, nfo_link, "de", "10")
+    index.add_media(key, media_file, {"title": "Other"}, nfo_link, "fr", "10")
+    assert index.indexed_paths() == {media_file}
+    cached = index.get_episode(media_file, ("fr", "de"), "10", 1, 2)
+    assert cached["fields"]["fr"]["title"] == "Titre"
+
+    assert index.read_media(str(tmp_path / "missing.nfo"), "movie") == (
+        None,
+        None,
+        "",
+    )
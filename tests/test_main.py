@@ -0,0 +1,34 @@
+"""Tests for NFO generation"""
+from movie_nfo_generator.__main__ import _previous_infos, _read_scraper_id
+from movie_nfo_generator.nfo import write_nfo
+from movie_nfo_generator.scraper_tmdb import LANGUAGE
+
+LINK = "https://www.themoviedb.org/movie/11"
+
+
+def test_read_scraper_id(tmp_path):
+    """Test reading the scrapper ID from the NFO link"""
+    write_nfo("movie", {"title": "Title"}, str(tmp_path / "movie"), LINK)
+    assert _read_scraper_id(str(tmp_path / "movie.nfo"), "movie") == "11"
+
+    write_nfo("movie", {"title": "Title"}, str(tmp_path / "nolink"))
+    assert _read_scraper_id(str(tmp_path / "nolink.nfo"), "movie") is None
+    assert _read_scraper_id(str(tmp_path / "missing.nfo"), "movie") is None
+
+    nfo_file = tmp_path / "movie.nfo"
+    nfo_file.write_text(nfo_file.read_text().replace("</movie>", "</mo"))
+    assert _read_scraper_id(str(nfo_file), "movie") is None
+
+
+def test_previous_infos(tmp_path):
+    """Test the scrapper ID and title to repair are reused, not searched again"""
+    nfo_file = tmp_path / "movie.nfo"
+    cached = {"fields": {LANGUAGE: {"title": "Cached"}}, "link": LINK}
+
+    write_nfo("movie", {"title": "Title"}, str(tmp_path / "movie"), LINK)
+    assert _previous_infos(str(nfo_file), "movie", cached) == ("11", "Title")
+
+    nfo_file.write_bytes(nfo_file.read_bytes()[:20])
+    assert _previous_infos(str(nfo_file), "movie", cached) == ("11", "Cached")
+    assert _previous_infos(str(nfo_file), "movie") == (None, None)
+    assert _previous_infos(str(tmp_path / "missing.nfo"), "movie") == (None, None)
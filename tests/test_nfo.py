@@ -0,0 +1,70 @@
+"""Tests for NFO file utilities"""
+from movie_nfo_generator.nfo import audit_nfo, read_nfo, write_nfo
+
+LINK = "https://www.themoviedb.org/movie/1"
+PREFIX = "https://www.themoviedb.org/movie/"
+FIELDS = {"title": "Title", "originaltitle": "Original", "plot": "Plot"}
+
+
+def _audit(nfo_file, root_name="movie"):
+    """Audit a movie NFO file"""
+    return audit_nfo(
+        str(nfo_file), root_name, ("title", "originaltitle"), PREFIX, ("plot",)
+    )
+
+
+def test_audit_nfo_valid(tmp_path):
+    """Test a complete NFO written by write_nfo"""
+    write_nfo("movie", dict(FIELDS, genre=["a", "b"]), str(tmp_path / "movie"), LINK)
+    assert _audit(tmp_path / "movie.nfo") == ([], [])
+
+
+def test_audit_nfo_optional_fields(tmp_path):
+    """Test missing optional fields are not problems"""
+    write_nfo("movie", dict(FIELDS, plot=""), str(tmp_path / "movie"), LINK)
+    assert _audit(tmp_path / "movie.nfo") == ([], ["plot"])
+
+
+def test_audit_nfo_missing_fields(tmp_path):
+    """Test missing required fields and link"""
+    write_nfo("movie", {"title": "Title"}, str(tmp_path / "movie"))
+    problems, _ = _audit(tmp_path / "movie.nfo")
+    assert problems == ["missing originaltitle", "missing scrapper link"]
+
+
+def test_audit_nfo_invalid(tmp_path):
+    """Test unreadable, truncated and invalid files"""
+    nfo_file = tmp_path / "movie.nfo"
+    assert _audit(nfo_file)[0][0].startswith("unreadable")
+
+    write_nfo("movie", FIELDS, str(tmp_path / "movie"), LINK)
+    nfo_file.write_bytes(nfo_file.read_bytes()[:60])
+    assert _audit(nfo_file) == (["truncated or invalid root"], [])
+
+    nfo_file.write_bytes(b"<movie><title>Title</movie>")
+    assert _audit(nfo_file)[0][0].startswith("invalid XML")
+
+    nfo_file.write_bytes(b"<tvshow><title>Title</title></tvshow><movie></movie>")
+    assert _audit(nfo_file) == (['invalid root "tvshow"'], [])
+
+
+def test_read_nfo(tmp_path):
+    """Test reading fields and link"""
+    write_nfo("movie", dict(FIELDS, genre=["a", "b"]), str(tmp_path / "movie"), LINK)
+    assert read_nfo(str(tmp_path / "movie.nfo"), "movie") == (
+        dict(FIELDS, genre=["a", "b"]),
+        LINK,
+    )
+
+
+def test_write_nfo_zero(tmp_path):
+    """Test numeric zeros are written, empty values are skipped"""
+    fields = {"title": "Title", "season": 1, "episode": 0, "plot": "", "genre": []}
+    write_nfo("episodedetails", fields, str(tmp_path / "episode"), LINK)
+    assert read_nfo(str(tmp_path / "episode.nfo"), "episodedetails") == (
+        {"title": "Title", "season": "1", "episode": "0"},
+        LINK,
+    )
+    assert audit_nfo(
+        str(tmp_path / "episode.nfo"), "episodedetails", ("title", "episode"), PREFIX
+    ) == ([], [])
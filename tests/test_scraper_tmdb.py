@@ -0,0 +1,60 @@
+"""Tests for The Movie DataBase utilities"""
+from movie_nfo_generator.scraper_tmdb import LANGUAGE, _translate, _translation
+
+
+def _infos(*translations):
+    """Return a response with appended translations"""
+    return {
+        "translations": {
+            "translations": [
+                {"iso_639_1": language, "iso_3166_1": region, "data": data}
+                for language, region, data in translations
+            ]
+        }
+    }
+
+
+INFOS = _infos(
+    ("pt", "PT", {"title": "Titulo PT"}),
+    ("pt", "BR", {"title": "Titulo BR"}),
+    ("de", "DE", {"title": "", "overview": "Handlung"}),
+)
+
+
+def test_translation():
+    """Test region and bare language matching"""
+    assert _translation(INFOS, "pt-BR") == {"title": "Titulo BR"}
+    assert _translation(INFOS, "pt-pt") == {"title": "Titulo PT"}
+    assert _translation(INFOS, "pt") == {"title": "Titulo PT"}
+    assert _translation(INFOS, "pt-AO") == {"title": "Titulo PT"}
+    assert _translation(INFOS, "es") == {}
+
+
+def test_translate():
+    """Test translated fields and fallbacks"""
+    nfo_fields = {
+        "title": "Titre",
+        "originaltitle": "Original",
+        "plot": "Intrigue",
+        "tagline": "Slogan",
+        "genre": ["Drame"],
+    }
+    translated_fields = {"title": "title", "plot": "overview", "tagline": "tagline"}
+    fields = _translate(
+        nfo_fields, INFOS, (LANGUAGE, "pt-BR", "de", "es"), translated_fields
+    )
+
+    assert fields[LANGUAGE] is nfo_fields
+    assert fields["pt-BR"]["title"] == "Titulo BR"
+    assert fields["pt-BR"]["plot"] == ""
+
+    # Missing title fall back to original title, never to main language
+    assert fields["de"]["title"] == "Original"
+    assert fields["de"]["plot"] == "Handlung"
+    assert fields["de"]["tagline"] == ""
+
+    # Missing translation
+    assert fields["es"] == dict(
+        nfo_fields, title="Original", plot="", tagline=""
+    )
+    assert fields["es"]["genre"] == ["Drame"]